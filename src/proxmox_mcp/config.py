@@ -1,16 +1,51 @@
 """Configuration management for Proxmox MCP server."""
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from pathlib import Path
 
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on", "y", "t"})
+_FALSE_VALUES = frozenset({"0", "false", "no", "off", "n", "f", ""})
+
+
+def _parse_bool(value: str) -> bool:
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _read_env_file(path: Path) -> dict[str, str]:
+    """Read KEY=VALUE pairs from a .env file, ignoring comments and blank lines."""
+    values: dict[str, str] = {}
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return values
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        key = key.removeprefix("export ").strip()
+        value = value.strip()
+        if value[:1] in ("'", '"') and value[0] in value[1:]:
+            # Quoted value ends at its closing quote; anything after is a comment
+            value = value[1 : value.index(value[0], 1)]
+        elif " #" in value:
+            value = value.split(" #", 1)[0].rstrip()
+        values[key.lower()] = value
+
+    return values
 
-class Settings(BaseSettings):
-    """Application settings loaded from environment variables."""
 
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        case_sensitive=False,
-    )
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application settings loaded from environment variables."""
 
     # Proxmox connection settings
     proxmox_host: str = "localhost"
@@ -30,6 +65,33 @@ class Settings(BaseSettings):
     mcp_server_host: str = "0.0.0.0"
     mcp_server_port: int = 8080
 
+    @classmethod
+    def from_env(cls, env_file: str | Path | None = ".env") -> "Settings":
+        """Load settings from environment variables and an optional .env file.
+
+        Variable names are matched case-insensitively against the field names.
+        Real environment variables take precedence over the .env file.
+        """
+        env = _read_env_file(Path(env_file)) if env_file else {}
+        env.update((key.lower(), value) for key, value in os.environ.items())
+
+        values = {}
+        for field in fields(cls):
+            raw = env.get(field.name)
+            if raw is None:
+                continue
+            try:
+                if field.type is bool:
+                    values[field.name] = _parse_bool(raw)
+                elif field.type is int:
+                    values[field.name] = int(raw)
+                else:
+                    values[field.name] = raw
+            except ValueError as e:
+                raise ValueError(f"Invalid value for {field.name.upper()}: {e}") from e
+
+        return cls(**values)
+
     @property
     def proxmox_base_url(self) -> str:
         """Construct the Proxmox API base URL."""
@@ -41,4 +103,14 @@ class Settings(BaseSettings):
         return bool(self.proxmox_api_token_id and self.proxmox_api_token_secret)
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, loading them on first use."""
+    return Settings.from_env()
+
+
+def __getattr__(name: str):
+    # `from .config import settings` defers loading until the name is imported
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,51 @@
 """Async Proxmox API client for read-only operations."""
 
+import asyncio
+import itertools
 import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from functools import lru_cache
 from typing import Any
 
 import httpx
+import ijson
+import orjson
 
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# Transient upstream failures worth retrying for idempotent requests
+RETRY_STATUS_CODES = frozenset({502, 503, 504})
+MAX_RETRIES = 2
+
+# Upper bound on concurrent per-node requests when listing guests node by node
+NODE_FANOUT_CONCURRENCY = 8
+
+# Guest fields consumed by the MCP tools (list_vms and vmid -> node lookups)
+VM_FIELDS = frozenset(
+    {"vmid", "name", "status", "node", "type", "cpus", "maxcpu", "maxmem", "maxdisk", "uptime"}
+)
+
+# RRD metrics consumed by get_vm_metrics; Proxmox returns many more columns
+RRD_FIELDS = frozenset(
+    {"time", "cpu", "mem", "maxmem", "diskread", "diskwrite", "netin", "netout"}
+)
+
+# RRD data is consolidated into buckets that grow with the timeframe, so the
+# longer views can be cached for much longer without going stale
+RRD_CACHE_TTLS = {"hour": 30.0, "day": 300.0, "week": 1800.0, "month": 1800.0, "year": 3600.0}
+
 
 class ProxmoxClientError(Exception):
     """Base exception for Proxmox client errors."""
 
-    pass
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        # HTTP status of the failed response; None if no response was received
+        self.status_code = status_code
 
 
 class ProxmoxAuthError(ProxmoxClientError):
@@ -22,29 +54,152 @@ class ProxmoxAuthError(ProxmoxClientError):
     pass
 
 
+@lru_cache(maxsize=4096)
+def _vm_path(node: str, vmid: int, suffix: str, kind: str = "qemu") -> str:
+    """Build (and memoize) the API path of a guest endpoint, e.g. '.../qemu/100/config'."""
+    return f"/nodes/{node}/{kind}/{vmid}/{suffix}"
+
+
+async def _read_projected(response: httpx.Response, keys: frozenset[str]) -> list[dict[str, Any]]:
+    """Incrementally parse the `data` list of a response, keeping only `keys` per item."""
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, "data.item", use_float=True)
+    result: list[dict[str, Any]] = []
+
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        result.extend({k: v for k, v in item.items() if k in keys} for item in items)
+        del items[:]
+    parser.close()
+    result.extend({k: v for k, v in item.items() if k in keys} for item in items)
+
+    return result
+
+
+class _TTLCache:
+    """In-memory TTL cache for async lookups.
+
+    Concurrent misses on the same key are coalesced: only the first caller runs
+    the factory, the others wait on a per-key lock and reuse its result.
+    Expired entries are dropped when read and swept periodically on writes, so
+    keys that are never read again do not accumulate.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self._ttl = ttl
+        self._data: dict[str, tuple[float, Any]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._next_sweep = 0.0
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] > time.monotonic():
+            return True, entry[1]
+        del self._data[key]
+        return False, None
+
+    def _sweep(self, now: float) -> None:
+        """Drop all expired entries, at most once per default TTL."""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._ttl
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+
+    async def get_or_set(
+        self, key: str, factory: Callable[[], Awaitable[Any]], ttl: float | None = None
+    ) -> Any:
+        """Return the cached value for key, calling factory on a miss."""
+        hit, value = self._lookup(key)
+        if hit:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                hit, value = self._lookup(key)
+                if hit:
+                    return value
+                value = await factory()
+                now = time.monotonic()
+                self._sweep(now)
+                self._data[key] = (now + (self._ttl if ttl is None else ttl), value)
+                return value
+        finally:
+            # Waiters keep their own reference; drop the entry once it is idle
+            if not lock.locked() and self._locks.get(key) is lock:
+                del self._locks[key]
+
+    def invalidate(self, key_prefix: str | None = None) -> None:
+        """Drop cached entries whose key starts with key_prefix (all if None)."""
+        if key_prefix is None:
+            self._data.clear()
+            return
+        for key in [k for k in self._data if k.startswith(key_prefix)]:
+            del self._data[key]
+
+
 class ProxmoxClient:
     """Async HTTP client for Proxmox VE API (read-only operations)."""
 
     def __init__(self) -> None:
-        self._client: httpx.AsyncClient | None = None
+        # One pooled client for the process; authentication happens on first use
+        self._client = self._build_http_client()
+        self._authenticated = False
         self._auth_ticket: str | None = None
         self._csrf_token: str | None = None
+        # API token credentials never change, so their header is built once here
+        self._token_headers: dict[str, str] | None = (
+            self._build_token_headers() if settings.use_api_token else None
+        )
+        self._ticket_headers: dict[str, str] | None = None
+        self._cache = _TTLCache(ttl=30.0)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._auth_lock = asyncio.Lock()
+        self._auth_epoch = 0
+
+    @staticmethod
+    def _build_http_client() -> httpx.AsyncClient:
+        # HTTP/2 multiplexes concurrent requests over one keep-alive connection
+        return httpx.AsyncClient(
+            base_url=settings.proxmox_base_url,
+            verify=settings.proxmox_verify_ssl,
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=60.0,
+            ),
+        )
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create the HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                base_url=settings.proxmox_base_url,
-                verify=settings.proxmox_verify_ssl,
-                timeout=30.0,
-            )
-            await self._authenticate()
+        """Return the shared HTTP client, authenticating on first use."""
+        if not self._authenticated or self._client.is_closed:
+            # Serialize cold starts so concurrent first requests authenticate once
+            async with self._auth_lock:
+                if self._client.is_closed:
+                    self._client = self._build_http_client()
+                if not self._authenticated:
+                    # Left unset on failure so the next request retries
+                    await self._authenticate()
+                    self._authenticated = True
+                    self._auth_epoch += 1
         return self._client
 
+    async def _reauthenticate(self, epoch: int) -> None:
+        """Re-authenticate unless another request already did so since `epoch`."""
+        async with self._auth_lock:
+            if self._auth_epoch == epoch:
+                await self._authenticate()
+                self._auth_epoch += 1
+
     async def _authenticate(self) -> None:
         """Authenticate with Proxmox API."""
         if settings.use_api_token:
-            # API token auth - no ticket needed, just set header
+            # API token auth - no ticket needed, header built in __init__
             logger.info("Using API token authentication")
             return
 
@@ -55,7 +210,7 @@ class ProxmoxClient:
                 "PROXMOX_API_TOKEN_SECRET, or PROXMOX_USERNAME and PROXMOX_PASSWORD."
             )
 
-        logger.info(f"Authenticating as {settings.proxmox_username}@{settings.proxmox_realm}")
+        logger.info("Authenticating as %s@%s", settings.proxmox_username, settings.proxmox_realm)
 
         try:
             response = await self._client.post(
@@ -66,55 +221,135 @@ class ProxmoxClient:
                 },
             )
             response.raise_for_status()
-            data = response.json()["data"]
+            data = orjson.loads(response.content)["data"]
             self._auth_ticket = data["ticket"]
             self._csrf_token = data["CSRFPreventionToken"]
+            # Cleared only now: requests sent during the login may have rebuilt
+            # it from the old ticket
+            self._ticket_headers = None
             logger.info("Authentication successful")
         except httpx.HTTPStatusError as e:
             raise ProxmoxAuthError(f"Authentication failed: {e.response.text}") from e
         except Exception as e:
             raise ProxmoxAuthError(f"Authentication failed: {e}") from e
 
-    def _get_headers(self) -> dict[str, str]:
-        """Get authentication headers for API requests."""
-        headers = {}
-
-        if settings.use_api_token:
-            # API token format: PVEAPIToken=user@realm!tokenid=secret
-            headers["Authorization"] = (
+    @staticmethod
+    def _build_token_headers() -> dict[str, str]:
+        # API token format: PVEAPIToken=user@realm!tokenid=secret
+        return {
+            "Authorization": (
                 f"PVEAPIToken={settings.proxmox_api_token_id}={settings.proxmox_api_token_secret}"
             )
-        elif self._auth_ticket:
-            headers["Cookie"] = f"PVEAuthCookie={self._auth_ticket}"
+        }
+
+    def _get_headers(self) -> dict[str, str]:
+        """Get authentication headers for API requests.
+
+        The header dict is built once per credential and reused across requests,
+        so callers must not mutate it.
+        """
+        if self._token_headers is not None:
+            return self._token_headers
+
+        if self._auth_ticket is None:
+            return {}
+
+        if self._ticket_headers is None:
+            headers = {"Cookie": f"PVEAuthCookie={self._auth_ticket}"}
             if self._csrf_token:
                 headers["CSRFPreventionToken"] = self._csrf_token
+            self._ticket_headers = headers
+        return self._ticket_headers
 
-        return headers
+    async def _request(
+        self, method: str, path: str, fields: Iterable[str] | None = None, **kwargs
+    ) -> Any:
+        """Make an authenticated API request.
 
-    async def _request(self, method: str, path: str, **kwargs) -> Any:
-        """Make an authenticated API request."""
-        client = await self._get_client()
-        headers = self._get_headers()
+        Concurrent identical GET requests share a single in-flight HTTP call.
+        With `fields`, the `data` list is stream-parsed and each item reduced to
+        those keys, so large responses are never materialized in full.
+        """
+        projection = frozenset(fields) if fields is not None else None
+        if method != "GET":
+            return await self._send(method, path, projection, **kwargs)
 
-        try:
-            response = await client.request(method, path, headers=headers, **kwargs)
-            response.raise_for_status()
-            return response.json().get("data")
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                # Try re-authenticating once
-                await self._authenticate()
-                headers = self._get_headers()
-                response = await client.request(method, path, headers=headers, **kwargs)
-                response.raise_for_status()
-                return response.json().get("data")
-            raise ProxmoxClientError(f"API request failed: {e.response.text}") from e
-        except Exception as e:
-            raise ProxmoxClientError(f"API request failed: {e}") from e
+        key = (method, path, tuple(sorted((kwargs.get("params") or {}).items())), projection)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send(method, path, projection, **kwargs))
+            self._inflight[key] = task
+
+            def _done(finished: asyncio.Future) -> None:
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+
+            task.add_done_callback(_done)
+
+        # Shield so one caller being cancelled does not cancel the shared request
+        return await asyncio.shield(task)
 
-    async def get(self, path: str, **kwargs) -> Any:
-        """Make a GET request."""
-        return await self._request("GET", path, **kwargs)
+    async def _send(
+        self, method: str, path: str, projection: frozenset[str] | None = None, **kwargs
+    ) -> Any:
+        """Send a single authenticated API request.
+
+        GET requests are retried with jittered exponential backoff on connection
+        errors and 502/503/504 responses; a 401 triggers one re-authentication.
+        """
+        client = await self._get_client()
+        attempt = 0
+        reauthenticated = False
+
+        while True:
+            retryable = method == "GET" and attempt < MAX_RETRIES
+            epoch = self._auth_epoch
+            try:
+                async with client.stream(
+                    method, path, headers=self._get_headers(), **kwargs
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+                    if projection is not None:
+                        return await _read_projected(response, projection)
+                    return orjson.loads(await response.aread()).get("data")
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code == 401 and not reauthenticated:
+                    # Try re-authenticating once
+                    await self._reauthenticate(epoch)
+                    reauthenticated = True
+                    continue
+                if not (retryable and status_code in RETRY_STATUS_CODES):
+                    raise ProxmoxClientError(
+                        f"API request failed: {e.response.text}", status_code=status_code
+                    ) from e
+                error: Exception = e
+            except httpx.TransportError as e:
+                if not retryable:
+                    raise ProxmoxClientError(f"API request failed: {e}") from e
+                error = e
+            except Exception as e:
+                raise ProxmoxClientError(f"API request failed: {e}") from e
+
+            delay = min(0.1 * 2**attempt, 1.0) + random.random() * 0.05
+            logger.warning("GET %s failed (%r), retrying in %.2fs", path, error, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, path: str, fields: Iterable[str] | None = None, **kwargs) -> Any:
+        """Make a GET request, optionally keeping only `fields` of each list item."""
+        return await self._request("GET", path, fields=fields, **kwargs)
+
+    def invalidate(self, key_prefix: str | None = None) -> None:
+        """Drop cached API responses whose cache key starts with key_prefix.
+
+        Keys are 'nodes', 'cluster_status', 'storage', 'vm_config:<node>:<vmid>'
+        and 'rrddata:<node>:<vmid>:<timeframe>:<fields>' (fields comma-joined, or '*').
+        Clears the whole cache when key_prefix is None.
+        """
+        self._cache.invalidate(key_prefix)
 
     # =========================================================================
     # Cluster & Node Operations
@@ -122,11 +357,78 @@ class ProxmoxClient:
 
     async def get_cluster_status(self) -> list[dict[str, Any]]:
         """Get cluster status including all nodes."""
-        return await self.get("/cluster/status")
+        return await self._cache.get_or_set(
+            "cluster_status", lambda: self.get("/cluster/status"), ttl=10.0
+        )
+
+    async def get_cluster_resources(
+        self, type: str | None = None, fields: Iterable[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Get resources across the whole cluster in a single request.
+
+        Args:
+            type: Optional resource type filter ('vm', 'storage', 'node', 'sdn').
+                'vm' returns both QEMU VMs and LXC containers, each row tagged
+                with its 'type' and hosting 'node'.
+            fields: Optional keys to keep in each row; the response is then
+                stream-parsed instead of loaded whole
+        """
+        return await self.get(
+            "/cluster/resources", params={"type": type} if type else None, fields=fields
+        )
 
     async def get_nodes(self) -> list[dict[str, Any]]:
         """Get list of all nodes in the cluster."""
-        return await self.get("/nodes")
+        return await self._cache.get_or_set("nodes", lambda: self.get("/nodes"), ttl=30.0)
+
+    async def get_guests_by_type(
+        self, kinds: Iterable[str] = ("qemu", "lxc")
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Get VMs and containers across all nodes, grouped by type.
+
+        Args:
+            kinds: Guest types needed ('qemu', 'lxc'). One /cluster/resources
+                request lists both, so both are returned regardless; `kinds`
+                only limits the per-node fallback used when the token may not
+                read /cluster/resources (HTTP 403).
+        """
+        try:
+            resources = await self.get_cluster_resources("vm", fields=VM_FIELDS)
+        except ProxmoxClientError as e:
+            if e.status_code != 403:
+                raise
+            logger.warning("Permission denied for /cluster/resources, querying nodes instead")
+            kinds = tuple(kinds)
+            results = await asyncio.gather(*(self._get_guests_per_node(k) for k in kinds))
+            return dict(zip(kinds, results))
+
+        grouped: dict[str, list[dict[str, Any]]] = {"qemu": [], "lxc": []}
+        for resource in resources or []:
+            guests = grouped.get(resource.get("type"))
+            if guests is not None:
+                guests.append(resource)
+        return grouped
+
+    async def _get_guests_per_node(self, kind: str) -> list[dict[str, Any]]:
+        """List guests of one type ('qemu' or 'lxc') by querying every node.
+
+        Nodes are queried concurrently, at most NODE_FANOUT_CONCURRENCY at a
+        time; nodes that fail are logged and skipped.
+        """
+        nodes = await self.get_nodes()
+        semaphore = asyncio.Semaphore(NODE_FANOUT_CONCURRENCY)
+
+        async def list_node(node: str) -> list[dict[str, Any]]:
+            async with semaphore:
+                try:
+                    guests = await self.get(f"/nodes/{node}/{kind}", fields=VM_FIELDS)
+                except ProxmoxClientError as e:
+                    logger.warning("Failed to get %s guests from node %s: %s", kind, node, e)
+                    return []
+            return [dict(guest, node=node, type=kind) for guest in guests or []]
+
+        results = await asyncio.gather(*(list_node(n["node"]) for n in nodes))
+        return list(itertools.chain.from_iterable(results))
 
     async def get_node_status(self, node: str) -> dict[str, Any]:
         """Get detailed status for a specific node."""
@@ -138,53 +440,59 @@ class ProxmoxClient:
 
     async def get_all_vms(self) -> list[dict[str, Any]]:
         """Get all VMs across all nodes."""
-        nodes = await self.get_nodes()
-        all_vms = []
-
-        for node_info in nodes:
-            node = node_info["node"]
-            try:
-                vms = await self.get("/nodes/{}/qemu".format(node))
-                for vm in vms or []:
-                    vm["node"] = node
-                    all_vms.append(vm)
-            except ProxmoxClientError as e:
-                logger.warning(f"Failed to get VMs from node {node}: {e}")
-
-        return all_vms
+        return (await self.get_guests_by_type(("qemu",)))["qemu"]
 
     async def get_vm_status(self, node: str, vmid: int) -> dict[str, Any]:
         """Get current status of a VM."""
-        return await self.get(f"/nodes/{node}/qemu/{vmid}/status/current")
+        return await self.get(_vm_path(node, vmid, "status/current"))
 
     async def get_vm_config(self, node: str, vmid: int) -> dict[str, Any]:
         """Get VM configuration."""
-        return await self.get(f"/nodes/{node}/qemu/{vmid}/config")
+        return await self._cache.get_or_set(
+            f"vm_config:{node}:{vmid}",
+            lambda: self.get(_vm_path(node, vmid, "config")),
+            ttl=60.0,
+        )
 
     async def get_vm_rrddata(
-        self, node: str, vmid: int, timeframe: str = "hour"
+        self,
+        node: str,
+        vmid: int,
+        timeframe: str = "hour",
+        fields: Iterable[str] | None = None,
     ) -> list[dict[str, Any]]:
-        """Get VM metrics/RRD data.
+        """Get VM metrics/RRD data (averaged per bucket).
 
         Args:
             node: Node name
             vmid: VM ID
             timeframe: One of 'hour', 'day', 'week', 'month', 'year'
+            fields: Optional metric names to keep in each data point (e.g. 'time',
+                'cpu'); all metrics are returned when omitted
         """
-        return await self.get(
-            f"/nodes/{node}/qemu/{vmid}/rrddata", params={"timeframe": timeframe}
+        # Rows are projected before caching; the projection is part of the key
+        fields = frozenset(fields) if fields is not None else None
+        projection = ",".join(sorted(fields)) if fields is not None else "*"
+        return await self._cache.get_or_set(
+            f"rrddata:{node}:{vmid}:{timeframe}:{projection}",
+            lambda: self.get(
+                _vm_path(node, vmid, "rrddata"),
+                params={"timeframe": timeframe, "cf": "AVERAGE"},
+                fields=fields,
+            ),
+            ttl=RRD_CACHE_TTLS.get(timeframe, 30.0),
         )
 
     async def get_vm_snapshots(self, node: str, vmid: int) -> list[dict[str, Any]]:
         """Get list of VM snapshots."""
-        return await self.get(f"/nodes/{node}/qemu/{vmid}/snapshot")
+        return await self.get(_vm_path(node, vmid, "snapshot"))
 
     async def get_vm_agent_fsinfo(self, node: str, vmid: int) -> list[dict[str, Any]]:
         """Get filesystem info from QEMU guest agent.
 
         Requires qemu-guest-agent to be installed and running in the VM.
         """
-        return await self.get(f"/nodes/{node}/qemu/{vmid}/agent/get-fsinfo")
+        return await self.get(_vm_path(node, vmid, "agent/get-fsinfo"))
 
     # =========================================================================
     # Container Operations (LXC)
@@ -192,29 +500,15 @@ class ProxmoxClient:
 
     async def get_all_containers(self) -> list[dict[str, Any]]:
         """Get all LXC containers across all nodes."""
-        nodes = await self.get_nodes()
-        all_containers = []
-
-        for node_info in nodes:
-            node = node_info["node"]
-            try:
-                containers = await self.get(f"/nodes/{node}/lxc")
-                for ct in containers or []:
-                    ct["node"] = node
-                    ct["type"] = "lxc"
-                    all_containers.append(ct)
-            except ProxmoxClientError as e:
-                logger.warning(f"Failed to get containers from node {node}: {e}")
-
-        return all_containers
+        return (await self.get_guests_by_type(("lxc",)))["lxc"]
 
     async def get_container_status(self, node: str, vmid: int) -> dict[str, Any]:
         """Get current status of a container."""
-        return await self.get(f"/nodes/{node}/lxc/{vmid}/status/current")
+        return await self.get(_vm_path(node, vmid, "status/current", "lxc"))
 
     async def get_container_config(self, node: str, vmid: int) -> dict[str, Any]:
         """Get container configuration."""
-        return await self.get(f"/nodes/{node}/lxc/{vmid}/config")
+        return await self.get(_vm_path(node, vmid, "config", "lxc"))
 
     # =========================================================================
     # Storage Operations
@@ -222,7 +516,7 @@ class ProxmoxClient:
 
     async def get_storage(self) -> list[dict[str, Any]]:
         """Get list of all storage pools."""
-        return await self.get("/storage")
+        return await self._cache.get_or_set("storage", lambda: self.get("/storage"), ttl=60.0)
 
     async def get_node_storage(self, node: str) -> list[dict[str, Any]]:
         """Get storage status for a specific node."""
@@ -241,11 +535,19 @@ class ProxmoxClient:
     # =========================================================================
 
     async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client:
+        """Close the HTTP client; a later request reopens it."""
+        if not self._client.is_closed:
             await self._client.aclose()
-            self._client = None
 
 
-# Global client instance
-proxmox = ProxmoxClient()
+@lru_cache(maxsize=1)
+def get_proxmox() -> ProxmoxClient:
+    """Return the shared Proxmox client, creating it on first use."""
+    return ProxmoxClient()
+
+
+def __getattr__(name: str):
+    # Keep `from .proxmox_client import proxmox` working for existing callers
+    if name == "proxmox":
+        return get_proxmox()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,23 +2,26 @@
 
 import asyncio
 import logging
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from mcp.server.fastmcp import FastMCP
+from .config import get_settings
 
-from .config import settings
-from .proxmox_client import proxmox
-from .tools.vms import register_vm_tools
+if TYPE_CHECKING:
+    # FastMCP, httpx and the tool modules are imported on first use so that
+    # `--help` and argument parsing stay cheap
+    from mcp.server.fastmcp import FastMCP
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 
-def create_mcp_server() -> FastMCP:
+def create_mcp_server() -> "FastMCP":
     """Create and configure the MCP server."""
+    from mcp.server.fastmcp import FastMCP
+
+    from .tools.vms import register_vm_tools
+
     mcp = FastMCP(
         name="proxmox-mcp",
         instructions="""
@@ -45,32 +48,107 @@ def create_mcp_server() -> FastMCP:
     return mcp
 
 
-# Create the server instance
-mcp = create_mcp_server()
+@lru_cache(maxsize=1)
+def get_mcp() -> "FastMCP":
+    """Return the shared MCP server, creating it on first use."""
+    return create_mcp_server()
+
+
+def __getattr__(name: str):
+    # Keep `proxmox_mcp.server.mcp` working without building it at import time
+    if name == "mcp":
+        return get_mcp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Interval for re-fetching the node list; kept under its 30s cache TTL
+NODES_REFRESH_INTERVAL = 25.0
+
 
+async def _warmup() -> None:
+    """Authenticate and prime the node cache, then keep it fresh.
 
-async def run_sse_server():
-    """Run the MCP server with SSE transport using FastMCP's sse_app."""
+    Runs in the background so the first tool call does not pay for the TLS
+    handshake, authentication and the /nodes round-trip.
+    """
+    from .proxmox_client import get_proxmox
+
+    proxmox = get_proxmox()
+    try:
+        await proxmox._get_client()
+        await proxmox.get_nodes()
+        logger.info("Proxmox client warmed up")
+    except Exception as e:
+        logger.warning("Proxmox warm-up failed: %s", e)
+
+    while True:
+        await asyncio.sleep(NODES_REFRESH_INTERVAL)
+        try:
+            proxmox.invalidate("nodes")
+            await proxmox.get_nodes()
+        except Exception as e:
+            logger.warning("Failed to refresh node list: %s", e)
+
+
+async def run_sse_server(host: str | None = None, port: int | None = None):
+    """Run the MCP server with SSE transport using FastMCP's sse_app.
+
+    Args:
+        host: Address to bind to (default: MCP_SERVER_HOST)
+        port: Port to bind to (default: MCP_SERVER_PORT)
+    """
     import uvicorn
-    
-    logger.info(f"Starting SSE server on http://{settings.mcp_server_host}:{settings.mcp_server_port}")
-    logger.info(f"MCP SSE endpoint: http://{settings.mcp_server_host}:{settings.mcp_server_port}/sse")
+
+    settings = get_settings()
+    host = host or settings.mcp_server_host
+    port = port or settings.mcp_server_port
+    logger.info("Starting SSE server on http://%s:%s", host, port)
+    logger.info("MCP SSE endpoint: http://%s:%s/sse", host, port)
     
     # Get the Starlette app from FastMCP
-    app = mcp.sse_app()
+    app = get_mcp().sse_app()
     
     config = uvicorn.Config(
         app,
-        host=settings.mcp_server_host,
-        port=settings.mcp_server_port,
+        host=host,
+        port=port,
         log_level="info",
     )
     server = uvicorn.Server(config)
-    await server.serve()
+
+    warmup = asyncio.create_task(_warmup())
+    try:
+        await server.serve()
+    finally:
+        warmup.cancel()
+        await cleanup()
+
+
+async def run_stdio_server():
+    """Run the MCP server over stdio, closing the Proxmox client on exit."""
+    try:
+        await get_mcp().run_stdio_async()
+    finally:
+        await cleanup()
+
+
+def _run(coro):
+    """Run a coroutine on uvloop where it is available, else on the default asyncio loop."""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.run(coro)
+    return asyncio.run(coro)
 
 
 async def cleanup():
     """Cleanup resources on shutdown."""
+    from .proxmox_client import get_proxmox
+
+    proxmox = get_proxmox()
     await proxmox.close()
     logger.info("Proxmox client closed")
 
@@ -79,6 +157,14 @@ def main():
     """Main entry point for the MCP server."""
     import argparse
 
+    # Configure logging for the process; importing this module leaves it untouched
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    settings = get_settings()
     parser = argparse.ArgumentParser(description="Proxmox MCP Server")
     parser.add_argument(
         "--transport",
@@ -99,23 +185,15 @@ def main():
     )
     args = parser.parse_args()
 
-    # Override settings if provided
-    if args.host:
-        settings.mcp_server_host = args.host
-    if args.port:
-        settings.mcp_server_port = args.port
-
     try:
         if args.transport == "stdio":
             logger.info("Starting MCP server with stdio transport")
-            mcp.run(transport="stdio")
+            _run(run_stdio_server())
         else:
             logger.info("Starting MCP server with SSE transport")
-            asyncio.run(run_sse_server())
+            _run(run_sse_server(args.host, args.port))
     except KeyboardInterrupt:
         logger.info("Server interrupted by user")
-    finally:
-        asyncio.run(cleanup())
 
 
 if __name__ == "__main__":
@@ -1,125 +1,322 @@
 """VM-related MCP tools for Proxmox."""
 
+import asyncio
+import itertools
 import logging
-from typing import Any
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any, Literal
 
 from mcp.server.fastmcp import FastMCP
 
-from ..proxmox_client import proxmox
+from ..proxmox_client import RRD_FIELDS, get_proxmox
 
 logger = logging.getLogger(__name__)
 
+TIMEFRAMES = ("hour", "day", "week", "month", "year")
+
+# Config keys that describe guest disks (QEMU buses, LXC rootfs/mount points)
+DISK_PREFIXES = ("scsi", "virtio", "ide", "sata", "rootfs", "mp")
+
+# Result layouts: "aos" is a list of row dicts, "soa" a dict of column lists
+ResultFormat = Literal["aos", "soa"]
+GuestType = Literal["qemu", "lxc"]
+
+LIST_VMS_COLUMNS = (
+    "vmid",
+    "name",
+    "status",
+    "node",
+    "type",
+    "cpus",
+    "memory_bytes",
+    "disk_bytes",
+    "uptime_seconds",
+)
+METRICS_COLUMNS = (
+    "timestamp",
+    "cpu_percent",
+    "memory_bytes",
+    "memory_max_bytes",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "network_in_bytes",
+    "network_out_bytes",
+)
+
+# Upper bound on concurrent RRD requests issued by get_vms_metrics
+METRICS_CONCURRENCY = 50
+
+# How long the vmid -> node index is trusted before the guest list is re-fetched
+VM_INDEX_TTL = 30.0
+
+
+@dataclass
+class _VmIndexCache:
+    """vmid -> node mapping for one guest type, valid until expires_at."""
+
+    nodes: dict[int, str] = field(default_factory=dict)
+    expires_at: float = 0.0
+    # Rebuild in progress; concurrent misses await it instead of fetching again
+    inflight: asyncio.Future | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+_vm_index: dict[str, _VmIndexCache] = {"qemu": _VmIndexCache(), "lxc": _VmIndexCache()}
+
+# (vmid, kind filter) -> (node, expires_at) memo of recent lookups; cleared on every
+# index rebuild, so it never outlives or outgrows the snapshots it was read from
+_resolved_nodes: dict[tuple[int, str | None], tuple[str, float]] = {}
+
+
+async def _rebuild_vm_index(kinds: tuple[str, ...]) -> None:
+    """Re-fetch guests and store the vmid -> node mapping of every listed type.
+
+    The cluster-wide listing covers both guest types in one request, so both
+    indexes are refreshed even when only `kinds` had expired; only the per-node
+    fallback is limited to `kinds`.
+    """
+    try:
+        listing = await get_proxmox().get_guests_by_type(kinds)
+        expires_at = time.monotonic() + VM_INDEX_TTL
+        for kind, guests in listing.items():
+            cache = _vm_index[kind]
+            cache.nodes = {guest["vmid"]: guest["node"] for guest in guests}
+            cache.expires_at = expires_at
+        _resolved_nodes.clear()
+    finally:
+        for kind in kinds:
+            _vm_index[kind].inflight = None
+
+
+async def _refresh_vm_index(kinds: tuple[str, ...]) -> None:
+    """Rebuild the index for the given guest types that have expired.
+
+    Only the first caller for a type starts a fetch; everyone else awaits the
+    same future, so N concurrent misses make one upstream call and a failure
+    is raised to all of them.
+    """
+    caches = [_vm_index[kind] for kind in kinds]
+    stale = tuple(
+        kind for kind, cache in zip(kinds, caches) if not cache.fresh and cache.inflight is None
+    )
+    if stale:
+        future = asyncio.ensure_future(_rebuild_vm_index(stale))
+        for kind in stale:
+            _vm_index[kind].inflight = future
+
+    pending = {cache.inflight for cache in caches if not cache.fresh}
+    # Shield so a cancelled caller does not abort a rebuild others are waiting on
+    await asyncio.gather(*(asyncio.shield(future) for future in pending))
+
+
+async def _resolve_node(vmid: int, kind: str | None = None) -> str | None:
+    """Find the node hosting a guest using the cached vmid -> node index.
+
+    Args:
+        vmid: The VM or container ID
+        kind: Only consider 'qemu' VMs or 'lxc' containers (default: both)
+
+    Returns the node name, or None if no such guest exists.
+    """
+    memo = _resolved_nodes.get((vmid, kind))
+    if memo is not None and time.monotonic() < memo[1]:
+        return memo[0]
+
+    kinds = (kind,) if kind else ("qemu", "lxc")
+    if not all(_vm_index[k].fresh for k in kinds):
+        await _refresh_vm_index(kinds)
+
+    for k in kinds:
+        cache = _vm_index[k]
+        node = cache.nodes.get(vmid)
+        if node is not None:
+            _resolved_nodes[(vmid, kind)] = (node, cache.expires_at)
+            return node
+    return None
+
+
+def _percent(used: float, total: float) -> float:
+    """Return used/total as a percentage rounded to 2 places, or 0.0 when total is 0."""
+    return round(used / total * 100, 2) if total else 0.0
+
+
+def _to_columns(rows: list[dict[str, Any]], columns: Iterable[str]) -> dict[str, list[Any]]:
+    """Convert row dicts into parallel per-column lists (array-of-structs to struct-of-arrays)."""
+    return {column: [row[column] for row in rows] for column in columns}
+
+
+async def _fetch_vm_metrics(
+    node: str, vmid: int, timeframe: str, format: ResultFormat = "aos"
+) -> dict[str, Any]:
+    """Fetch and format RRD metrics for one VM on a known node."""
+    proxmox = get_proxmox()
+
+    try:
+        rrd_data = await proxmox.get_vm_rrddata(node, vmid, timeframe, fields=RRD_FIELDS)
+    except Exception as e:
+        return {"error": f"Failed to get metrics: {e}"}
+
+    if not rrd_data:
+        return {
+            "vmid": vmid,
+            "node": node,
+            "timeframe": timeframe,
+            "message": "No metrics data available",
+            "data_points": _to_columns([], METRICS_COLUMNS) if format == "soa" else [],
+        }
+
+    # Process and return the metrics
+    data_points = [
+        {
+            "timestamp": point.get("time"),
+            "cpu_percent": round((point.get("cpu") or 0) * 100, 2),
+            "memory_bytes": point.get("mem", 0),
+            "memory_max_bytes": point.get("maxmem", 0),
+            "disk_read_bytes": point.get("diskread", 0),
+            "disk_write_bytes": point.get("diskwrite", 0),
+            "network_in_bytes": point.get("netin", 0),
+            "network_out_bytes": point.get("netout", 0),
+        }
+        for point in rrd_data
+    ]
+
+    return {
+        "vmid": vmid,
+        "node": node,
+        "timeframe": timeframe,
+        "data_points_count": len(data_points),
+        "data_points": (
+            _to_columns(data_points, METRICS_COLUMNS) if format == "soa" else data_points
+        ),
+    }
+
 
 def register_vm_tools(mcp: FastMCP) -> None:
     """Register all VM-related tools with the MCP server."""
 
     @mcp.tool()
-    async def list_vms() -> list[dict[str, Any]]:
+    async def list_vms(
+        format: ResultFormat = "aos",
+    ) -> list[dict[str, Any]] | dict[str, list[Any]]:
         """List all VMs and containers across all Proxmox nodes.
 
-        Returns a list of all virtual machines and LXC containers with their
-        basic information including:
+        Args:
+            format: 'aos' (default) returns a list with one dict per guest;
+                'soa' returns one dict mapping each field below to a list of
+                values, index-aligned across fields (more compact for large clusters)
+
+        Returns all virtual machines and LXC containers with their basic
+        information including:
         - vmid: The VM/container ID
         - name: The VM/container name
         - status: Current status (running, stopped, etc.)
         - node: The Proxmox node hosting this VM
         - type: 'qemu' for VMs or 'lxc' for containers
-        - cpu: Number of CPUs
-        - maxmem: Maximum memory in bytes
-        - maxdisk: Maximum disk size in bytes
+        - cpus: Number of CPUs
+        - memory_bytes: Maximum memory in bytes
+        - disk_bytes: Maximum disk size in bytes
+        - uptime_seconds: Uptime in seconds
         """
         logger.info("Listing all VMs and containers")
+        proxmox = get_proxmox()
 
         # Get both VMs and containers
-        vms = await proxmox.get_all_vms()
-        containers = await proxmox.get_all_containers()
+        vms, containers = await asyncio.gather(
+            proxmox.get_all_vms(), proxmox.get_all_containers()
+        )
 
         # Mark VMs with type
         for vm in vms:
             vm["type"] = "qemu"
 
-        all_guests = vms + containers
+        all_guests = itertools.chain(vms, containers)
 
         # Return simplified, consistent format
-        result = []
-        for guest in all_guests:
-            result.append(
-                {
-                    "vmid": guest.get("vmid"),
-                    "name": guest.get("name", f"VM-{guest.get('vmid')}"),
-                    "status": guest.get("status"),
-                    "node": guest.get("node"),
-                    "type": guest.get("type"),
-                    "cpus": guest.get("cpus", guest.get("maxcpu", 0)),
-                    "memory_bytes": guest.get("maxmem", 0),
-                    "disk_bytes": guest.get("maxdisk", 0),
-                    "uptime_seconds": guest.get("uptime", 0),
-                }
-            )
+        result = [
+            {
+                "vmid": guest.get("vmid"),
+                "name": guest.get("name") or f"VM-{guest.get('vmid')}",
+                "status": guest.get("status"),
+                "node": guest.get("node"),
+                "type": guest.get("type"),
+                "cpus": guest.get("cpus", guest.get("maxcpu", 0)),
+                "memory_bytes": guest.get("maxmem", 0),
+                "disk_bytes": guest.get("maxdisk", 0),
+                "uptime_seconds": guest.get("uptime", 0),
+            }
+            for guest in all_guests
+        ]
 
-        logger.info(f"Found {len(result)} VMs/containers")
+        logger.info("Found %d VMs/containers", len(result))
+        if format == "soa":
+            return _to_columns(result, LIST_VMS_COLUMNS)
         return result
 
     @mcp.tool()
-    async def get_vm_info(vmid: int, node: str | None = None) -> dict[str, Any]:
+    async def get_vm_info(
+        vmid: int, node: str | None = None, type: GuestType | None = None
+    ) -> dict[str, Any]:
         """Get detailed information about a specific VM or container.
 
         Args:
             vmid: The VM or container ID (e.g., 100, 101)
             node: The Proxmox node name. If not provided, will search all nodes.
+            type: 'qemu' or 'lxc' if known; skips lookups for the other guest type
 
         Returns detailed configuration including:
         - Hardware: CPU, memory, disks, network interfaces
         - Settings: Boot order, OS type, description
         - Status: Current state, uptime, resource usage
         """
-        logger.info(f"Getting info for VM {vmid} on node {node or 'auto-detect'}")
+        logger.info("Getting info for VM %s on node %s", vmid, node or "auto-detect")
+        proxmox = get_proxmox()
 
         # If node not provided, find the VM
         if node is None:
-            all_vms = await proxmox.get_all_vms()
-            all_containers = await proxmox.get_all_containers()
-
-            for vm in all_vms + all_containers:
-                if vm.get("vmid") == vmid:
-                    node = vm.get("node")
-                    break
-
+            node = await _resolve_node(vmid, type)
             if node is None:
                 return {"error": f"VM {vmid} not found on any node"}
 
-        # Try QEMU first, then LXC
-        try:
-            config = await proxmox.get_vm_config(node, vmid)
-            status = await proxmox.get_vm_status(node, vmid)
-            vm_type = "qemu"
-        except Exception:
+        # Try QEMU first, then LXC, unless the caller named the guest type
+        for vm_type in (type,) if type else ("qemu", "lxc"):
             try:
-                config = await proxmox.get_container_config(node, vmid)
-                status = await proxmox.get_container_status(node, vmid)
-                vm_type = "lxc"
+                if vm_type == "qemu":
+                    config, status = await asyncio.gather(
+                        proxmox.get_vm_config(node, vmid), proxmox.get_vm_status(node, vmid)
+                    )
+                else:
+                    config, status = await asyncio.gather(
+                        proxmox.get_container_config(node, vmid),
+                        proxmox.get_container_status(node, vmid),
+                    )
+                break
             except Exception as e:
-                return {"error": f"Failed to get VM/container info: {e}"}
+                error = e
+        else:
+            return {"error": f"Failed to get VM/container info: {error}"}
 
-        # Parse network interfaces
+        # Parse network interfaces and disks in a single pass over the config
         networks = []
-        for key, value in config.items():
-            if key.startswith("net") and value:
-                networks.append({"interface": key, "config": value})
-
-        # Parse disks
         disks = []
-        disk_prefixes = ("scsi", "virtio", "ide", "sata", "rootfs", "mp")
         for key, value in config.items():
-            if any(key.startswith(p) for p in disk_prefixes) and value:
-                if isinstance(value, str) and (":" in value or "volume" in value.lower()):
+            if not value:
+                continue
+            if key.startswith("net"):
+                networks.append({"interface": key, "config": value})
+            elif key.startswith(DISK_PREFIXES) and isinstance(value, str):
+                if ":" in value or "volume" in value.lower():
                     disks.append({"device": key, "config": value})
 
         return {
             "vmid": vmid,
             "node": node,
             "type": vm_type,
-            "name": config.get("name", status.get("name", f"VM-{vmid}")),
+            "name": config.get("name") or status.get("name") or f"VM-{vmid}",
             "description": config.get("description", ""),
             "status": status.get("status"),
             "uptime_seconds": status.get("uptime", 0),
@@ -144,12 +341,15 @@ def register_vm_tools(mcp: FastMCP) -> None:
         }
 
     @mcp.tool()
-    async def get_vm_status(vmid: int, node: str | None = None) -> dict[str, Any]:
+    async def get_vm_status(
+        vmid: int, node: str | None = None, type: GuestType | None = None
+    ) -> dict[str, Any]:
         """Get the current runtime status of a VM or container.
 
         Args:
             vmid: The VM or container ID
             node: The Proxmox node name (optional, will auto-detect)
+            type: 'qemu' or 'lxc' if known; skips lookups for the other guest type
 
         Returns:
         - status: running, stopped, paused, etc.
@@ -159,45 +359,39 @@ def register_vm_tools(mcp: FastMCP) -> None:
         - network I/O stats
         - disk I/O stats
         """
-        logger.info(f"Getting status for VM {vmid}")
+        logger.info("Getting status for VM %s", vmid)
+        proxmox = get_proxmox()
 
         # Find node if not provided
         if node is None:
-            all_vms = await proxmox.get_all_vms()
-            all_containers = await proxmox.get_all_containers()
-
-            for vm in all_vms + all_containers:
-                if vm.get("vmid") == vmid:
-                    node = vm.get("node")
-                    break
-
+            node = await _resolve_node(vmid, type)
             if node is None:
                 return {"error": f"VM {vmid} not found"}
 
-        # Try QEMU first, then LXC
-        try:
-            status = await proxmox.get_vm_status(node, vmid)
-            vm_type = "qemu"
-        except Exception:
+        # Try QEMU first, then LXC, unless the caller named the guest type
+        for vm_type in (type,) if type else ("qemu", "lxc"):
             try:
-                status = await proxmox.get_container_status(node, vmid)
-                vm_type = "lxc"
+                if vm_type == "qemu":
+                    status = await proxmox.get_vm_status(node, vmid)
+                else:
+                    status = await proxmox.get_container_status(node, vmid)
+                break
             except Exception as e:
-                return {"error": f"Failed to get status: {e}"}
+                error = e
+        else:
+            return {"error": f"Failed to get status: {error}"}
 
         return {
             "vmid": vmid,
             "node": node,
             "type": vm_type,
-            "name": status.get("name", f"VM-{vmid}"),
+            "name": status.get("name") or f"VM-{vmid}",
             "status": status.get("status"),
             "uptime_seconds": status.get("uptime", 0),
             "cpu_usage_percent": round(status.get("cpu", 0) * 100, 2),
             "memory_used_bytes": status.get("mem", 0),
             "memory_total_bytes": status.get("maxmem", 0),
-            "memory_usage_percent": round(
-                (status.get("mem", 0) / max(status.get("maxmem", 1), 1)) * 100, 2
-            ),
+            "memory_usage_percent": _percent(status.get("mem", 0), status.get("maxmem", 0)),
             "disk_read_bytes": status.get("diskread", 0),
             "disk_write_bytes": status.get("diskwrite", 0),
             "network_in_bytes": status.get("netin", 0),
@@ -208,7 +402,10 @@ def register_vm_tools(mcp: FastMCP) -> None:
 
     @mcp.tool()
     async def get_vm_metrics(
-        vmid: int, node: str | None = None, timeframe: str = "hour"
+        vmid: int,
+        node: str | None = None,
+        timeframe: str = "hour",
+        format: ResultFormat = "aos",
     ) -> dict[str, Any]:
         """Get historical metrics/performance data for a VM.
 
@@ -221,6 +418,8 @@ def register_vm_tools(mcp: FastMCP) -> None:
                 - 'week': Last 7 days
                 - 'month': Last 30 days
                 - 'year': Last year
+            format: 'aos' (default) returns data_points as a list of dicts;
+                'soa' returns data_points as a dict of index-aligned lists
 
         Returns time-series data including:
         - CPU usage over time
@@ -228,59 +427,55 @@ def register_vm_tools(mcp: FastMCP) -> None:
         - Network I/O over time
         - Disk I/O over time
         """
-        logger.info(f"Getting metrics for VM {vmid} over {timeframe}")
+        logger.info("Getting metrics for VM %s over %s", vmid, timeframe)
 
-        if timeframe not in ("hour", "day", "week", "month", "year"):
+        if timeframe not in TIMEFRAMES:
             return {"error": f"Invalid timeframe: {timeframe}. Use hour/day/week/month/year"}
 
         # Find node if not provided
         if node is None:
-            all_vms = await proxmox.get_all_vms()
-            for vm in all_vms:
-                if vm.get("vmid") == vmid:
-                    node = vm.get("node")
-                    break
-
+            node = await _resolve_node(vmid, "qemu")
             if node is None:
                 return {"error": f"VM {vmid} not found"}
 
-        try:
-            rrd_data = await proxmox.get_vm_rrddata(node, vmid, timeframe)
-        except Exception as e:
-            return {"error": f"Failed to get metrics: {e}"}
+        return await _fetch_vm_metrics(node, vmid, timeframe, format)
 
-        if not rrd_data:
-            return {
-                "vmid": vmid,
-                "node": node,
-                "timeframe": timeframe,
-                "message": "No metrics data available",
-                "data_points": [],
-            }
+    @mcp.tool()
+    async def get_vms_metrics(
+        vmids: list[int], timeframe: str = "hour", format: ResultFormat = "aos"
+    ) -> dict[str, Any]:
+        """Get historical metrics/performance data for several VMs in one call.
 
-        # Process and return the metrics
-        data_points = []
-        for point in rrd_data:
-            data_points.append(
-                {
-                    "timestamp": point.get("time"),
-                    "cpu_percent": round((point.get("cpu", 0) or 0) * 100, 2),
-                    "memory_bytes": point.get("mem", 0),
-                    "memory_max_bytes": point.get("maxmem", 0),
-                    "disk_read_bytes": point.get("diskread", 0),
-                    "disk_write_bytes": point.get("diskwrite", 0),
-                    "network_in_bytes": point.get("netin", 0),
-                    "network_out_bytes": point.get("netout", 0),
-                }
-            )
+        Args:
+            vmids: The VM IDs to fetch metrics for (e.g., [100, 101, 102])
+            timeframe: Time range for metrics - one of 'hour' (default), 'day',
+                'week', 'month', 'year'
+            format: Layout of each VM's data_points, as in get_vm_metrics
 
-        return {
-            "vmid": vmid,
-            "node": node,
-            "timeframe": timeframe,
-            "data_points_count": len(data_points),
-            "data_points": data_points,
-        }
+        Returns:
+        - timeframe: The requested time range
+        - vms: One entry per VM, shaped like the get_vm_metrics result; VMs that
+          could not be found or queried carry an 'error' instead
+        """
+        logger.info("Getting metrics for %d VMs over %s", len(vmids), timeframe)
+
+        if timeframe not in TIMEFRAMES:
+            return {"error": f"Invalid timeframe: {timeframe}. Use hour/day/week/month/year"}
+
+        semaphore = asyncio.Semaphore(METRICS_CONCURRENCY)
+
+        async def one(vmid: int) -> dict[str, Any]:
+            node = await _resolve_node(vmid, "qemu")
+            if node is None:
+                return {"vmid": vmid, "error": f"VM {vmid} not found"}
+            async with semaphore:
+                result = await _fetch_vm_metrics(node, vmid, timeframe, format)
+            if "error" in result:
+                return {"vmid": vmid, "node": node, **result}
+            return result
+
+        results = await asyncio.gather(*(one(vmid) for vmid in dict.fromkeys(vmids)))
+        return {"timeframe": timeframe, "vms": results}
 
     @mcp.tool()
     async def list_nodes() -> list[dict[str, Any]]:
@@ -293,6 +488,7 @@ def register_vm_tools(mcp: FastMCP) -> None:
         - Uptime
         """
         logger.info("Listing all Proxmox nodes")
+        proxmox = get_proxmox()
 
         nodes = await proxmox.get_nodes()
 
@@ -305,9 +501,7 @@ def register_vm_tools(mcp: FastMCP) -> None:
                     "cpu_usage_percent": round((node.get("cpu", 0) or 0) * 100, 2),
                     "memory_used_bytes": node.get("mem", 0),
                     "memory_total_bytes": node.get("maxmem", 0),
-                    "memory_usage_percent": round(
-                        (node.get("mem", 0) / max(node.get("maxmem", 1), 1)) * 100, 2
-                    ),
+                    "memory_usage_percent": _percent(node.get("mem", 0), node.get("maxmem", 0)),
                     "disk_used_bytes": node.get("disk", 0),
                     "disk_total_bytes": node.get("maxdisk", 0),
                     "uptime_seconds": node.get("uptime", 0),
@@ -329,16 +523,12 @@ def register_vm_tools(mcp: FastMCP) -> None:
         - Creation time
         - Whether it includes RAM state
         """
-        logger.info(f"Listing snapshots for VM {vmid}")
+        logger.info("Listing snapshots for VM %s", vmid)
+        proxmox = get_proxmox()
 
         # Find node if not provided
         if node is None:
-            all_vms = await proxmox.get_all_vms()
-            for vm in all_vms:
-                if vm.get("vmid") == vmid:
-                    node = vm.get("node")
-                    break
-
+            node = await _resolve_node(vmid, "qemu")
             if node is None:
                 return [{"error": f"VM {vmid} not found"}]
 
@@ -374,9 +564,12 @@ def register_vm_tools(mcp: FastMCP) -> None:
         - Total resources (CPU, memory, storage)
         """
         logger.info("Getting cluster status")
+        proxmox = get_proxmox()
 
         try:
-            cluster_status = await proxmox.get_cluster_status()
+            cluster_status, node_details = await asyncio.gather(
+                proxmox.get_cluster_status(), proxmox.get_nodes()
+            )
         except Exception as e:
             return {"error": f"Failed to get cluster status: {e}"}
 
@@ -403,19 +596,11 @@ def register_vm_tools(mcp: FastMCP) -> None:
                 )
 
         # Get aggregate stats
-        node_details = await proxmox.get_nodes()
-        total_cpu = 0
-        total_mem = 0
-        total_disk = 0
-        used_mem = 0
-        used_disk = 0
-
-        for n in node_details:
-            total_mem += n.get("maxmem", 0)
-            total_disk += n.get("maxdisk", 0)
-            used_mem += n.get("mem", 0)
-            used_disk += n.get("disk", 0)
-            total_cpu += n.get("maxcpu", 0)
+        total_cpu = sum(n.get("maxcpu", 0) for n in node_details)
+        total_mem = sum(n.get("maxmem", 0) for n in node_details)
+        total_disk = sum(n.get("maxdisk", 0) for n in node_details)
+        used_mem = sum(n.get("mem", 0) for n in node_details)
+        used_disk = sum(n.get("disk", 0) for n in node_details)
 
         return {
             "cluster": cluster_info,
@@ -424,10 +609,10 @@ def register_vm_tools(mcp: FastMCP) -> None:
                 "cpu_cores": total_cpu,
                 "memory_total_bytes": total_mem,
                 "memory_used_bytes": used_mem,
-                "memory_usage_percent": round((used_mem / max(total_mem, 1)) * 100, 2),
+                "memory_usage_percent": _percent(used_mem, total_mem),
                 "disk_total_bytes": total_disk,
                 "disk_used_bytes": used_disk,
-                "disk_usage_percent": round((used_disk / max(total_disk, 1)) * 100, 2),
+                "disk_usage_percent": _percent(used_disk, total_disk),
             },
         }
 
@@ -450,16 +635,12 @@ def register_vm_tools(mcp: FastMCP) -> None:
         - Free space
         - Filesystem type
         """
-        logger.info(f"Getting filesystem info for VM {vmid}")
+        logger.info("Getting filesystem info for VM %s", vmid)
+        proxmox = get_proxmox()
 
         # Find node if not provided
         if node is None:
-            all_vms = await proxmox.get_all_vms()
-            for vm in all_vms:
-                if vm.get("vmid") == vmid:
-                    node = vm.get("node")
-                    break
-
+            node = await _resolve_node(vmid, "qemu")
             if node is None:
                 return {"error": f"VM {vmid} not found"}
 
@@ -501,7 +682,7 @@ def register_vm_tools(mcp: FastMCP) -> None:
                 "total_gb": round(total_bytes / (1024**3), 2) if total_bytes else 0,
                 "used_gb": round(used_bytes / (1024**3), 2) if used_bytes else 0,
                 "free_gb": round(free_bytes / (1024**3), 2) if free_bytes else 0,
-                "usage_percent": round((used_bytes / total_bytes) * 100, 2) if total_bytes else 0,
+                "usage_percent": _percent(used_bytes, total_bytes),
             })
 
         return {
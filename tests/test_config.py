@@ -0,0 +1,82 @@
+"""Tests for settings loading."""
+
+import os
+
+import pytest
+
+from proxmox_mcp.config import Settings, _parse_bool, _read_env_file
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    """Remove any real PROXMOX_/MCP_ variables so only the test input is read."""
+    for key in list(os.environ):
+        if key.upper().startswith(("PROXMOX_", "MCP_")):
+            monkeypatch.delenv(key)
+
+
+def test_read_env_file_handles_quotes_comments_and_export(tmp_path):
+    """Test that .env values are unquoted and stripped of comments."""
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "# connection\n"
+        "\n"
+        'PROXMOX_HOST="pve.lan" # main node\n'
+        "PROXMOX_REALM='pve'\n"
+        "export PROXMOX_PORT=8443\n"
+        "PROXMOX_USERNAME=root # admin\n"
+        'PROXMOX_PASSWORD="pa#ss word"\n'
+        "not a setting\n"
+    )
+
+    assert _read_env_file(env_file) == {
+        "proxmox_host": "pve.lan",
+        "proxmox_realm": "pve",
+        "proxmox_port": "8443",
+        "proxmox_username": "root",
+        "proxmox_password": "pa#ss word",
+    }
+
+
+def test_read_env_file_missing_file_is_empty(tmp_path):
+    """Test that a missing .env file yields no values."""
+    assert _read_env_file(tmp_path / "missing.env") == {}
+
+
+def test_from_env_prefers_environment_over_file(tmp_path, monkeypatch):
+    """Test that real environment variables override the .env file."""
+    env_file = tmp_path / ".env"
+    env_file.write_text("PROXMOX_HOST=file-host\nPROXMOX_PORT=8443\nPROXMOX_VERIFY_SSL=yes\n")
+    monkeypatch.setenv("PROXMOX_HOST", "env-host")
+
+    settings = Settings.from_env(env_file)
+
+    assert settings.proxmox_host == "env-host"
+    assert settings.proxmox_port == 8443
+    assert settings.proxmox_verify_ssl is True
+    assert settings.proxmox_base_url == "https://env-host:8443/api2/json"
+
+
+def test_from_env_rejects_bad_int(tmp_path, monkeypatch):
+    """Test that a non-numeric port raises a ValueError naming the variable."""
+    monkeypatch.setenv("PROXMOX_PORT", "eighty")
+
+    with pytest.raises(ValueError, match="PROXMOX_PORT"):
+        Settings.from_env(tmp_path / ".env")
+
+
+def test_from_env_rejects_bad_bool(tmp_path, monkeypatch):
+    """Test that an unrecognised boolean raises a ValueError naming the variable."""
+    monkeypatch.setenv("PROXMOX_VERIFY_SSL", "maybe")
+
+    with pytest.raises(ValueError, match="PROXMOX_VERIFY_SSL"):
+        Settings.from_env(tmp_path / ".env")
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [("1", True), ("True", True), (" on ", True), ("0", False), ("no", False), ("", False)],
+)
+def test_parse_bool(raw, expected):
+    """Test the accepted boolean spellings."""
+    assert _parse_bool(raw) is expected
@@ -1,5 +1,8 @@
 """Tests for Proxmox client."""
 
+import asyncio
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
@@ -30,17 +33,51 @@ async def test_client_creates_auth_header(mock_settings):
 
     assert "Authorization" in headers
     assert headers["Authorization"] == "PVEAPIToken=test@pve!test=test-secret"
+    assert client._get_headers() is headers
+
+
+@pytest.mark.asyncio
+async def test_get_all_vms_uses_cluster_resources(mock_settings):
+    """Test that get_all_vms lists VMs cluster-wide in a single request."""
+    from proxmox_mcp.proxmox_client import VM_FIELDS, ProxmoxClient
+
+    client = ProxmoxClient()
+
+    # Mock the get method
+    async def mock_get(path, **kwargs):
+        if path == "/cluster/resources":
+            return [
+                {"vmid": 100, "name": "vm1", "status": "running", "node": "pve1", "type": "qemu"},
+                {"vmid": 101, "name": "ct1", "status": "running", "node": "pve1", "type": "lxc"},
+                {"vmid": 200, "name": "vm2", "status": "stopped", "node": "pve2", "type": "qemu"},
+            ]
+        return []
+
+    client.get = AsyncMock(side_effect=mock_get)
+
+    vms = await client.get_all_vms()
+
+    client.get.assert_awaited_once_with(
+        "/cluster/resources", params={"type": "vm"}, fields=VM_FIELDS
+    )
+    assert len(vms) == 2
+    assert vms[0]["vmid"] == 100
+    assert vms[0]["node"] == "pve1"
+    assert vms[1]["vmid"] == 200
+    assert vms[1]["node"] == "pve2"
 
 
 @pytest.mark.asyncio
 async def test_get_all_vms_aggregates_from_nodes(mock_settings):
-    """Test that get_all_vms fetches VMs from all nodes."""
-    from proxmox_mcp.proxmox_client import ProxmoxClient
+    """Test that get_all_vms falls back to fetching VMs from all nodes on 403."""
+    from proxmox_mcp.proxmox_client import ProxmoxClient, ProxmoxClientError
 
     client = ProxmoxClient()
 
     # Mock the get method
     async def mock_get(path, **kwargs):
+        if path == "/cluster/resources":
+            raise ProxmoxClientError("API request failed: permission denied", status_code=403)
         if path == "/nodes":
             return [{"node": "pve1"}, {"node": "pve2"}]
         elif "/qemu" in path:
@@ -59,3 +96,237 @@ async def test_get_all_vms_aggregates_from_nodes(mock_settings):
     assert vms[0]["node"] == "pve1"
     assert vms[1]["vmid"] == 200
     assert vms[1]["node"] == "pve2"
+
+
+@pytest.mark.asyncio
+async def test_get_all_vms_propagates_non_permission_errors(mock_settings):
+    """Test that only a 403 from /cluster/resources triggers the per-node fallback."""
+    from proxmox_mcp.proxmox_client import ProxmoxClient, ProxmoxClientError
+
+    client = ProxmoxClient()
+
+    async def mock_get(path, **kwargs):
+        if path == "/cluster/resources":
+            raise ProxmoxClientError("API request failed: internal error", status_code=500)
+        return []
+
+    client.get = AsyncMock(side_effect=mock_get)
+
+    with pytest.raises(ProxmoxClientError) as exc_info:
+        await client.get_all_vms()
+
+    assert exc_info.value.status_code == 500
+    assert [call.args[0] for call in client.get.await_args_list] == ["/cluster/resources"]
+
+
+@pytest.mark.asyncio
+async def test_get_nodes_is_cached_until_invalidated(mock_settings):
+    """Test that repeated get_nodes calls are served from the TTL cache."""
+    from proxmox_mcp.proxmox_client import ProxmoxClient
+
+    client = ProxmoxClient()
+    client.get = AsyncMock(return_value=[{"node": "pve1"}])
+
+    assert await client.get_nodes() == [{"node": "pve1"}]
+    assert await client.get_nodes() == [{"node": "pve1"}]
+    assert client.get.await_count == 1
+
+    client.invalidate("nodes")
+    await client.get_nodes()
+    assert client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_evicts_expired_entries():
+    """Test that expired entries and idle per-key locks are not kept around."""
+    from proxmox_mcp.proxmox_client import _TTLCache
+
+    cache = _TTLCache(ttl=30.0)
+    factory = AsyncMock(return_value="payload")
+
+    assert await cache.get_or_set("stale", factory, ttl=0.0) == "payload"
+    assert cache._locks == {}
+
+    # Once the sweep interval has passed, the next write drops the expired key
+    # even though it is never read again
+    cache._next_sweep = 0.0
+    await cache.get_or_set("fresh", factory)
+    assert set(cache._data) == {"fresh"}
+
+    # An expired read drops the entry and refetches
+    cache._data["fresh"] = (0.0, "old")
+    assert await cache.get_or_set("fresh", factory) == "payload"
+    assert factory.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_request(mock_settings):
+    """Test that concurrent GETs for the same path are coalesced."""
+    from proxmox_mcp.proxmox_client import ProxmoxClient
+
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"data": [{"node": "pve1"}]})
+
+    client = ProxmoxClient()
+    client._client = httpx.AsyncClient(
+        base_url=mock_settings.proxmox_base_url, transport=httpx.MockTransport(handler)
+    )
+
+    results = await asyncio.gather(client.get("/nodes"), client.get("/nodes"))
+
+    assert results == [[{"node": "pve1"}], [{"node": "pve1"}]]
+    assert calls == 1
+    assert client._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_get_retries_transient_server_errors(mock_settings):
+    """Test that GETs are retried on 503 and succeed once Proxmox recovers."""
+    from proxmox_mcp.proxmox_client import ProxmoxClient
+
+    responses = [
+        httpx.Response(503, text="pveproxy restarting"),
+        httpx.Response(200, json={"data": {"version": "8.2"}}),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    client = ProxmoxClient()
+    client._client = httpx.AsyncClient(
+        base_url=mock_settings.proxmox_base_url, transport=httpx.MockTransport(handler)
+    )
+
+    assert await client.get("/version") == {"version": "8.2"}
+    assert responses == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401s_reauthenticate_once(mock_settings):
+    """Test that an expired ticket is refreshed once for all racing requests.
+
+    One request starts while the login is in flight; it must not pin the old
+    ticket's headers for the requests retried after the login.
+    """
+    from proxmox_mcp.proxmox_client import ProxmoxClient
+
+    logins = 0
+
+    async def handler(request):
+        nonlocal logins
+        if request.url.path.endswith("/access/ticket"):
+            logins += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(
+                200, json={"data": {"ticket": "fresh", "CSRFPreventionToken": "csrf"}}
+            )
+        await asyncio.sleep(0.01)
+        if request.headers.get("Cookie") != "PVEAuthCookie=fresh":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"data": request.url.path})
+
+    mock_settings.use_api_token = False
+    mock_settings.proxmox_username = "root"
+    mock_settings.proxmox_password = "secret"
+    mock_settings.proxmox_realm = "pam"
+    client = ProxmoxClient()
+    client._client = httpx.AsyncClient(
+        base_url=mock_settings.proxmox_base_url, transport=httpx.MockTransport(handler)
+    )
+    client._auth_ticket = "expired"
+    client._authenticated = True  # skip the cold-start login so requests hit 401s
+
+    async def get_during_login():
+        await asyncio.sleep(0.03)
+        return await client.get("/nodes/late/status")
+
+    results = await asyncio.gather(
+        *(client.get(f"/nodes/pve{i}/status") for i in range(5)), get_during_login()
+    )
+
+    assert results == [f"/api2/json/nodes/pve{i}/status" for i in range(5)] + [
+        "/api2/json/nodes/late/status"
+    ]
+    assert logins == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_authentication_is_retried(mock_settings):
+    """Test that a failed first login does not leave the client unauthenticated."""
+    from proxmox_mcp.proxmox_client import ProxmoxAuthError, ProxmoxClient
+
+    client = ProxmoxClient()
+    client._client = httpx.AsyncClient(
+        base_url=mock_settings.proxmox_base_url,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"data": []})),
+    )
+    client._authenticate = AsyncMock(side_effect=[ProxmoxAuthError("down"), None])
+
+    with pytest.raises(ProxmoxAuthError):
+        await client.get("/nodes")
+    assert await client.get("/nodes") == []
+    assert client._authenticate.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_vm_rrddata_caches_projected_rows_per_timeframe(mock_settings):
+    """Test that RRD rows are averaged, projected before caching and kept per TTL."""
+    import time
+
+    from proxmox_mcp.proxmox_client import RRD_CACHE_TTLS, ProxmoxClient
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"data": [{"time": 1, "cpu": 0.5, "maxcpu": 4}]})
+
+    client = ProxmoxClient()
+    client._client = httpx.AsyncClient(
+        base_url=mock_settings.proxmox_base_url, transport=httpx.MockTransport(handler)
+    )
+
+    before = time.monotonic()
+    first = await client.get_vm_rrddata("pve1", 100, "day", fields=["time", "cpu"])
+    second = await client.get_vm_rrddata("pve1", 100, "day", fields=("cpu", "time"))
+
+    assert first == second == [{"time": 1, "cpu": 0.5}]
+    assert len(requests) == 1
+    assert requests[0].url.params["cf"] == "AVERAGE"
+    assert requests[0].url.params["timeframe"] == "day"
+
+    [(key, (expires_at, cached))] = client._cache._data.items()
+    assert key == "rrddata:pve1:100:day:cpu,time"
+    assert cached == [{"time": 1, "cpu": 0.5}]
+    assert before + RRD_CACHE_TTLS["day"] <= expires_at <= time.monotonic() + RRD_CACHE_TTLS["day"]
+
+
+@pytest.mark.asyncio
+async def test_get_with_fields_streams_projected_items(mock_settings):
+    """Test that list responses are reduced to the requested fields."""
+    from proxmox_mcp.proxmox_client import ProxmoxClient
+
+    def handler(request):
+        return httpx.Response(
+            200,
+            json={
+                "data": [
+                    {"vmid": 100, "node": "pve1", "cpu": 0.25, "diskread": 1, "template": 0},
+                    {"vmid": 101, "node": "pve2", "netin": 7},
+                ]
+            },
+        )
+
+    client = ProxmoxClient()
+    client._client = httpx.AsyncClient(
+        base_url=mock_settings.proxmox_base_url, transport=httpx.MockTransport(handler)
+    )
+
+    rows = await client.get("/cluster/resources", fields={"vmid", "node", "cpu"})
+
+    assert rows == [{"vmid": 100, "node": "pve1", "cpu": 0.25}, {"vmid": 101, "node": "pve2"}]
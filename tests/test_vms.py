@@ -0,0 +1,184 @@
+"""Tests for VM tool helpers."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def mock_proxmox(monkeypatch):
+    """Patch the shared client used by the VM tools and reset the node index."""
+    from proxmox_mcp.tools import vms
+
+    monkeypatch.setattr(
+        vms, "_vm_index", {"qemu": vms._VmIndexCache(), "lxc": vms._VmIndexCache()}
+    )
+    monkeypatch.setattr(vms, "_resolved_nodes", {})
+
+    client = MagicMock()
+    client.get_all_vms = AsyncMock(return_value=[{"vmid": 100, "node": "pve1"}])
+    client.get_all_containers = AsyncMock(return_value=[{"vmid": 200, "node": "pve2"}])
+    # Like the cluster-wide listing, every call returns both guest types
+    client.guests = {
+        "qemu": [{"vmid": 100, "node": "pve1"}],
+        "lxc": [{"vmid": 200, "node": "pve2"}],
+    }
+    client.get_guests_by_type = AsyncMock(side_effect=lambda kinds: client.guests)
+
+    with patch("proxmox_mcp.tools.vms.get_proxmox", return_value=client):
+        yield client
+
+
+@pytest.fixture
+def tools():
+    """Register the VM tools on a stub server and return them by name."""
+    from proxmox_mcp.tools.vms import register_vm_tools
+
+    registered = {}
+    mcp = MagicMock()
+    mcp.tool.return_value = lambda fn: registered.setdefault(fn.__name__, fn)
+    register_vm_tools(mcp)
+    return registered
+
+
+@pytest.mark.asyncio
+async def test_resolve_node_reuses_cached_index(mock_proxmox):
+    """Test that node lookups within the TTL share one guest listing."""
+    from proxmox_mcp.tools.vms import _resolve_node
+
+    assert await _resolve_node(100) == "pve1"
+    assert await _resolve_node(200) == "pve2"
+    assert await _resolve_node(300) is None
+
+    mock_proxmox.get_guests_by_type.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_resolve_node_limits_lookup_to_kind(mock_proxmox):
+    """Test that a qemu-only lookup ignores containers but indexes them too."""
+    from proxmox_mcp.tools.vms import _resolve_node
+
+    assert await _resolve_node(200, "qemu") is None
+    assert await _resolve_node(200) == "pve2"
+    mock_proxmox.get_guests_by_type.assert_awaited_once_with(("qemu",))
+
+
+@pytest.mark.asyncio
+async def test_index_rebuild_drops_memoized_lookups(mock_proxmox):
+    """Test that memoized lookups are discarded when the index is rebuilt."""
+    from proxmox_mcp.tools import vms
+
+    assert await vms._resolve_node(100, "qemu") == "pve1"
+    assert (100, "qemu") in vms._resolved_nodes
+
+    vms._vm_index["qemu"].expires_at = 0.0
+    mock_proxmox.guests["qemu"] = [{"vmid": 101, "node": "pve1"}]
+
+    assert await vms._resolve_node(101, "qemu") == "pve1"
+    assert vms._resolved_nodes == {(101, "qemu"): ("pve1", vms._vm_index["qemu"].expires_at)}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(mock_proxmox):
+    """Test that parallel lookups on a cold index trigger a single listing."""
+    from proxmox_mcp.tools.vms import _resolve_node
+
+    async def slow_listing(kinds):
+        await asyncio.sleep(0.01)
+        return mock_proxmox.guests
+
+    mock_proxmox.get_guests_by_type.side_effect = slow_listing
+
+    nodes = await asyncio.gather(*(_resolve_node(100, "qemu") for _ in range(10)))
+
+    assert nodes == ["pve1"] * 10
+    mock_proxmox.get_guests_by_type.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_vm_status_type_hint_skips_other_kind(mock_proxmox, tools):
+    """Test that a guest type hint avoids qemu lookups for a container."""
+    mock_proxmox.get_vm_status = AsyncMock()
+    mock_proxmox.get_container_status = AsyncMock(return_value={"status": "running"})
+
+    result = await tools["get_vm_status"](200, type="lxc")
+
+    assert result["node"] == "pve2"
+    assert result["type"] == "lxc"
+    mock_proxmox.get_guests_by_type.assert_awaited_once_with(("lxc",))
+    mock_proxmox.get_vm_status.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_vms_metrics_reports_per_vm_results(mock_proxmox, tools):
+    """Test that batch metrics collapse duplicates and report failures per VM."""
+    from proxmox_mcp.proxmox_client import ProxmoxClientError
+
+    mock_proxmox.guests["qemu"] = [
+        {"vmid": 100, "node": "pve1"},
+        {"vmid": 102, "node": "pve2"},
+    ]
+
+    async def rrddata(node, vmid, timeframe, fields=None):
+        if vmid == 102:
+            raise ProxmoxClientError("API request failed: timeout")
+        return [{"time": 1, "cpu": 0.5, "mem": 10}]
+
+    mock_proxmox.get_vm_rrddata = AsyncMock(side_effect=rrddata)
+
+    result = await tools["get_vms_metrics"]([100, 300, 100, 102], timeframe="day")
+
+    assert result["timeframe"] == "day"
+    ok, missing, failed = result["vms"]
+    assert ok["vmid"] == 100
+    assert ok["data_points"][0]["cpu_percent"] == 50.0
+    assert missing == {"vmid": 300, "error": "VM 300 not found"}
+    assert failed["vmid"] == 102
+    assert failed["node"] == "pve2"
+    assert "timeout" in failed["error"]
+    assert mock_proxmox.get_vm_rrddata.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_vms_metrics_rejects_invalid_timeframe(mock_proxmox, tools):
+    """Test that an unknown timeframe is rejected before any lookup."""
+    result = await tools["get_vms_metrics"]([100], timeframe="decade")
+
+    assert "Invalid timeframe" in result["error"]
+    mock_proxmox.get_guests_by_type.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_list_vms_soa_returns_aligned_columns(mock_proxmox, tools):
+    """Test that format='soa' returns one index-aligned list per field."""
+    from proxmox_mcp.tools.vms import LIST_VMS_COLUMNS
+
+    mock_proxmox.get_all_vms.return_value = [{"vmid": 100, "node": "pve1", "name": "web"}]
+    mock_proxmox.get_all_containers.return_value = [
+        {"vmid": 200, "node": "pve2", "type": "lxc", "maxmem": 512}
+    ]
+
+    result = await tools["list_vms"](format="soa")
+
+    assert tuple(result) == LIST_VMS_COLUMNS
+    assert all(len(values) == 2 for values in result.values())
+    assert result["vmid"] == [100, 200]
+    assert result["name"] == ["web", "VM-200"]
+    assert result["node"] == ["pve1", "pve2"]
+    assert result["type"] == ["qemu", "lxc"]
+    assert result["memory_bytes"] == [0, 512]
+
+
+@pytest.mark.asyncio
+async def test_get_vm_metrics_soa_with_no_data_returns_empty_columns(mock_proxmox, tools):
+    """Test that empty RRD data still yields every column in soa format."""
+    from proxmox_mcp.tools.vms import METRICS_COLUMNS
+
+    mock_proxmox.get_vm_rrddata = AsyncMock(return_value=[])
+
+    result = await tools["get_vm_metrics"](100, format="soa")
+
+    assert result["node"] == "pve1"
+    assert result["message"] == "No metrics data available"
+    assert result["data_points"] == {column: [] for column in METRICS_COLUMNS}